@@ -1,132 +1,26 @@
 import streamlit as st
 import os
-import json
-import fitz  # PyMuPDF
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
+from resume_core import (
+    content_signature,
+    customize_resume_for_job,
+    extract_text_from_pdf,
+    generate_cover_letter,
+    generate_resume_from_text,
+    generate_tailored_resume,
+    get_llm,
+    render_markdown,
+    rewrite_resume_for_impact,
+    rewrite_signature,
+    serialize_resume,
+)
 
-# --- Constants & Page Config ---
+# --- Page Config ---
 st.set_page_config(
     page_title="PragyanAI - AI Resume Co-pilot",
     page_icon="📄",
     layout="wide"
 )
 
-# --- Core Functions ---
-
-def extract_text_from_pdf(pdf_file):
-    """Extracts text content from an uploaded PDF file."""
-    try:
-        doc = fitz.open(stream=pdf_file.read(), filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
-        return text
-    except Exception as e:
-        st.error(f"Error reading PDF file: {e}")
-        return None
-
-@st.cache_data(show_spinner="Generating resume from your profile...")
-def generate_resume_from_text(_llm, text):
-    """Uses LLM to parse text and generate a structured resume in JSON."""
-    parser = JsonOutputParser()
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are an expert resume writer. Your task is to analyze the provided text from a LinkedIn profile or an existing resume and extract the user's information into a structured JSON format. 
-         The JSON object must have the following keys: 'name', 'contact' (as a dictionary with 'email', 'phone', 'linkedin_url'), 'summary', 'experience' (as a list of objects, each with 'title', 'company', 'duration', and 'description'), 'education' (a list of objects with 'institution', 'degree', 'duration'), and 'skills' (a list of strings).
-         Pay close attention to the 'Education' and 'Skills' sections to ensure they are parsed correctly and not mixed.
-         - For 'education': An entry should only be included if it is clearly an educational institution, degree, or certification. For entries like fellowships or non-degree programs, parse the main line as 'degree' and the organization as 'institution'. If duration is present, extract it.
-         - For 'skills': Extract only the specific skills, which are often listed under a 'Skills' heading or similar. Parse a comma-separated list into a JSON list of individual skill strings.
-         Clean and format the text professionally. For job descriptions, convert paragraphs into concise bullet points, each starting with '*'. Infer missing details logically if necessary, but don't invent information that isn't suggested by the text."""),
-        ("user", "Here is the text from the document:\n\n{document_text}"),
-        ("system", "Please provide the output in JSON format only.")
-    ])
-    
-    chain = prompt | _llm | parser
-    response = chain.invoke({"document_text": text})
-    return response
-
-@st.cache_data(show_spinner="Customizing resume for the job post...")
-def customize_resume_for_job(_llm, resume_data, job_description):
-    """Uses LLM to tailor the resume for a specific job description."""
-    parser = JsonOutputParser()
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are an AI-powered resume co-pilot. You will be given a resume in JSON format and a job description. 
-         Your task is to analyze the job description and strategically rewrite the 'summary' and the 'description' for each 'experience' entry in the resume. 
-         The goal is to align the candidate's skills and experience with the requirements of the job.
-         - For the summary: Create a powerful, concise professional summary that highlights the candidate's most relevant qualifications for this specific role.
-         - For experience descriptions: Rephrase the bullet points to use keywords and action verbs from the job description. Quantify achievements where possible and emphasize results that match the employer's needs. Ensure all bullet points start with '*'.
-         - Do not change any other part of the resume JSON. Return the entire modified JSON object."""),
-        ("user", "Here is the current resume:\n\n{resume}\n\nHere is the job description:\n\n{job_post}"),
-        ("system", "Please provide the updated resume in JSON format only.")
-    ])
-    
-    chain = prompt | _llm | parser
-    response = chain.invoke({"resume": json.dumps(resume_data), "job_post": job_description})
-    return response
-
-@st.cache_data(show_spinner="Formatting your resume for download...")
-def generate_markdown_resume(_llm, resume_data):
-    """Uses LLM to convert resume JSON into a clean Markdown format."""
-    parser = StrOutputParser()
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are a professional resume typesetter. Your task is to convert the following resume data from JSON format into a clean, well-structured Markdown document.
-
-Follow these formatting rules STRICTLY:
-- The very first line MUST be the candidate's name, preceded by '# '.
-- The second line MUST be the contact information, formatted as a single line (e.g., 'email | phone | linkedin').
-- Section titles (like 'Professional Summary', 'Work Experience') MUST be preceded by '## '.
-- For each experience entry, the job title and company MUST be on one line, in bold (e.g., '**Senior Developer at Tech Corp**').
-- The duration for each job or education MUST be on its own line, immediately following the title line.
-- Each point in a job description MUST start with '* '.
-- For education, the institution MUST be in bold (e.g., '**State University**').
-- The degree and duration for education should be on the next line.
-- The skills should be a single comma-separated line.
-- Do not add any extra text, comments, or explanations. Only output the Markdown resume."""),
-        ("user", "Here is the resume data:\n\n{resume_json}"),
-    ])
-    
-    chain = prompt | _llm | parser
-    response = chain.invoke({"resume_json": json.dumps(resume_data)})
-    return response
-
-@st.cache_data(show_spinner="Rewriting your resume for maximum impact...")
-def rewrite_resume_for_impact(_llm, resume_data):
-    """Uses LLM to rewrite the resume content to be more effective."""
-    parser = JsonOutputParser()
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are a world-class career coach and resume writer. You will be given a resume in JSON format. Your task is to rewrite the 'summary' and the 'description' for each 'experience' entry to be more impactful, professional, and achievement-oriented.
-         - For the summary: Craft a dynamic and compelling professional summary that immediately grabs the reader's attention and highlights the candidate's unique value proposition.
-         - For experience descriptions: Transform the descriptions from a list of duties into a showcase of accomplishments. Use the STAR (Situation, Task, Action, Result) method where possible. Start each bullet point with a strong action verb. Quantify results with numbers, percentages, or other metrics whenever you can infer them or suggest placeholders (e.g., 'Increased efficiency by over 25%'). Ensure all bullet points still start with '*'.
-         - Do not change any other part of the resume JSON. Return the entire modified JSON object."""),
-        ("user", "Here is the resume to rewrite:\n\n{resume}"),
-        ("system", "Please provide the rewritten resume in JSON format only.")
-    ])
-    
-    chain = prompt | _llm | parser
-    response = chain.invoke({"resume": json.dumps(resume_data)})
-    return response
-
-@st.cache_data(show_spinner="Generating a draft cover letter...")
-def generate_cover_letter(_llm, resume_data, job_description):
-    """Uses LLM to generate a cover letter."""
-    parser = StrOutputParser()
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are a professional career writer. Your task is to write a compelling and professional cover letter based on a candidate's resume and a specific job description.
-        The cover letter should be well-structured, concise, and tailored to the job.
-        - **Introduction:** Start with a strong opening that states the position being applied for and where it was seen.
-        - **Body Paragraphs:** Create 2-3 paragraphs that connect the candidate's key experiences and skills from their resume to the specific requirements listed in the job description. Do not just repeat the resume; explain *how* their experience is relevant.
-        - **Conclusion:** End with a strong closing paragraph that reiterates interest in the role and includes a clear call to action (e.g., expressing eagerness to discuss their qualifications in an interview).
-        - **Formatting:** Use professional and friendly language. The output should be a single block of text formatted in Markdown.
-        """),
-        ("user", "Here is the candidate's resume:\n\n{resume}\n\nHere is the job description they are applying for:\n\n{job_post}"),
-    ])
-
-    chain = prompt | _llm | parser
-    response = chain.invoke({"resume": json.dumps(resume_data), "job_post": job_description})
-    return response
-
 # --- Streamlit UI ---
 
 st.title("📄 PragyanAI - AI Resume Co-pilot")
@@ -135,10 +29,29 @@ st.write("Generate a professional resume from your LinkedIn profile or existing
 # --- Session State Initialization ---
 if 'resume_data' not in st.session_state:
     st.session_state.resume_data = None
+if 'resume_json_str' not in st.session_state:
+    st.session_state.resume_json_str = None
 if 'markdown_resume' not in st.session_state:
     st.session_state.markdown_resume = None
 if 'cover_letter' not in st.session_state:
     st.session_state.cover_letter = None
+# Signatures of the content the last rewrite produced and the last cover letter was written from
+if 'last_rewrite_sig' not in st.session_state:
+    st.session_state.last_rewrite_sig = None
+if 'cover_letter_sig' not in st.session_state:
+    st.session_state.cover_letter_sig = None
+
+EDITOR_KEYS = ('name', 'email', 'phone', 'linkedin_url', 'summary', 'skills')
+
+def set_resume_data(resume_data, reset_editor=True):
+    """Stores a new resume and its JSON string, resetting the editor widgets and the now-stale Markdown preview."""
+    if reset_editor:
+        for key in list(st.session_state):
+            if key in EDITOR_KEYS or key.startswith(('exp_', 'edu_')):
+                del st.session_state[key]
+    st.session_state.resume_data = resume_data
+    st.session_state.resume_json_str = serialize_resume(resume_data)
+    st.session_state.markdown_resume = None  # Stale until documents are prepared again
 
 # --- Sidebar for Inputs ---
 with st.sidebar:
@@ -176,77 +89,91 @@ if generate_button:
     elif not uploaded_pdf:
         st.error("Please upload your profile or resume PDF.")
     else:
-        llm = ChatGroq(temperature=0.2, groq_api_key=groq_api_key, model_name="llama-3.3-70b-versatile")
+        llm = get_llm(groq_api_key, 0.2)
         
         document_text = extract_text_from_pdf(uploaded_pdf)
         
         if document_text:
-            resume_json = generate_resume_from_text(llm, document_text)
             if job_description.strip():
-                final_resume_json = customize_resume_for_job(llm, resume_json, job_description)
+                final_resume_json = generate_tailored_resume(llm, document_text, job_description)
             else:
-                final_resume_json = resume_json
+                final_resume_json = generate_resume_from_text(llm, document_text)
             
-            st.session_state.resume_data = final_resume_json
-            st.success("Resume generated successfully! You can now edit the content below.")
+            if final_resume_json:
+                set_resume_data(final_resume_json)
+                st.success("Resume generated successfully! You can now edit the content below.")
 
 if st.session_state.resume_data:
     st.header("📝 Edit Your Resume")
     
     resume = st.session_state.resume_data
     
-    resume['name'] = st.text_input("Name", resume.get('name', ''), key='name')
+    # Widget values only reach the script when the form is submitted, so typing doesn't rerun the app.
+    with st.form("edit_resume", clear_on_submit=False):
+        name = st.text_input("Name", resume.get('name', ''), key='name')
     
-    contact_info = resume.get('contact', {})
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        contact_info['email'] = st.text_input("Email", contact_info.get('email', ''), key='email')
-    with col2:
-        contact_info['phone'] = st.text_input("Phone", contact_info.get('phone', ''), key='phone')
-    with col3:
-        contact_info['linkedin_url'] = st.text_input("LinkedIn URL", contact_info.get('linkedin_url', ''), key='linkedin_url')
-    resume['contact'] = contact_info
-
-    resume['summary'] = st.text_area("Professional Summary", resume.get('summary', ''), height=150, key='summary')
-
-    st.subheader("Work Experience")
-    for i, exp in enumerate(resume.get('experience', [])):
-        with st.expander(f"{exp.get('title', 'Job Title')} at {exp.get('company', 'Company')}", expanded=True):
-            exp['title'] = st.text_input("Title", exp.get('title', ''), key=f"exp_title_{i}")
-            exp['company'] = st.text_input("Company", exp.get('company', ''), key=f"exp_company_{i}")
-            exp['duration'] = st.text_input("Duration", exp.get('duration', ''), key=f"exp_duration_{i}")
-            exp['description'] = st.text_area("Description", exp.get('description', ''), height=150, key=f"exp_desc_{i}")
-
-    st.subheader("Education")
-    for i, edu in enumerate(resume.get('education', [])):
-         with st.expander(f"{edu.get('institution', 'Institution')}", expanded=True):
-            edu['institution'] = st.text_input("Institution", edu.get('institution', ''), key=f"edu_inst_{i}")
-            edu['degree'] = st.text_input("Degree/Field of Study", edu.get('degree', ''), key=f"edu_degree_{i}")
-            edu['duration'] = st.text_input("Duration", edu.get('duration', ''), key=f"edu_duration_{i}")
-
-    skills_list = resume.get('skills', [])
-    if isinstance(skills_list, list):
-        skills_str = ", ".join(skills_list)
-    else:
-        skills_str = skills_list
-    resume['skills'] = st.text_area("Skills (comma-separated)", skills_str, key='skills')
+        contact_info = resume.get('contact', {})
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            email = st.text_input("Email", contact_info.get('email', ''), key='email')
+        with col2:
+            phone = st.text_input("Phone", contact_info.get('phone', ''), key='phone')
+        with col3:
+            linkedin_url = st.text_input("LinkedIn URL", contact_info.get('linkedin_url', ''), key='linkedin_url')
+
+        summary = st.text_area("Professional Summary", resume.get('summary', ''), height=150, key='summary')
+
+        st.subheader("Work Experience")
+        experience = []
+        for i, exp in enumerate(resume.get('experience', [])):
+            with st.expander(f"{exp.get('title', 'Job Title')} at {exp.get('company', 'Company')}", expanded=True):
+                experience.append({
+                    'title': st.text_input("Title", exp.get('title', ''), key=f"exp_title_{i}"),
+                    'company': st.text_input("Company", exp.get('company', ''), key=f"exp_company_{i}"),
+                    'duration': st.text_input("Duration", exp.get('duration', ''), key=f"exp_duration_{i}"),
+                    'description': st.text_area("Description", exp.get('description', ''), height=150, key=f"exp_desc_{i}"),
+                })
+
+        st.subheader("Education")
+        education = []
+        for i, edu in enumerate(resume.get('education', [])):
+             with st.expander(f"{edu.get('institution', 'Institution')}", expanded=True):
+                education.append({
+                    'institution': st.text_input("Institution", edu.get('institution', ''), key=f"edu_inst_{i}"),
+                    'degree': st.text_input("Degree/Field of Study", edu.get('degree', ''), key=f"edu_degree_{i}"),
+                    'duration': st.text_input("Duration", edu.get('duration', ''), key=f"edu_duration_{i}"),
+                })
+
+        skills_str = st.text_area("Skills (comma-separated)", ", ".join(resume.get('skills', [])), key='skills')
+
+        submitted = st.form_submit_button("Apply edits")
+
+    if submitted:
+        set_resume_data({
+            'name': name,
+            'contact': {'email': email, 'phone': phone, 'linkedin_url': linkedin_url},
+            'summary': summary,
+            'experience': experience,
+            'education': education,
+            'skills': [skill.strip() for skill in skills_str.split(',') if skill.strip()],
+        }, reset_editor=False)
 
     # --- AI Writing Assistants ---
     st.header("✨ AI Writing Assistants")
     st.write("Use AI to further enhance your resume and create a cover letter.")
     
-    assist_col1, assist_col2 = st.columns(2)
+    assist_col1, assist_col2, assist_col3 = st.columns(3)
     with assist_col1:
         if st.button("🚀 Rewrite Resume for Impact"):
             if not groq_api_key:
                 st.error("Please enter your GROQ API key in the sidebar.")
+            elif rewrite_signature(st.session_state.resume_data) == st.session_state.last_rewrite_sig:
+                st.info("Your summary, experience, education and skills haven't changed since the last rewrite.")
             else:
-                llm = ChatGroq(temperature=0.4, groq_api_key=groq_api_key, model_name="llama-3.3-70b-versatile")
-                if isinstance(st.session_state.resume_data['skills'], str):
-                    st.session_state.resume_data['skills'] = [skill.strip() for skill in st.session_state.resume_data['skills'].split(',')]
-                
-                rewritten_resume_json = rewrite_resume_for_impact(llm, st.session_state.resume_data)
-                st.session_state.resume_data = rewritten_resume_json
+                llm = get_llm(groq_api_key, 0.4)
+                rewritten_resume_json = rewrite_resume_for_impact(llm, st.session_state.resume_json_str)
+                set_resume_data(rewritten_resume_json)
+                st.session_state.last_rewrite_sig = rewrite_signature(rewritten_resume_json)
                 st.success("Resume rewritten! The fields above have been updated with the new content.")
                 st.rerun()
 
@@ -257,13 +184,29 @@ if st.session_state.resume_data:
             elif not job_description.strip():
                 st.error("Please provide a job description in the sidebar to generate a cover letter.")
             else:
-                llm = ChatGroq(temperature=0.5, groq_api_key=groq_api_key, model_name="llama-3.3-70b-versatile")
-                if isinstance(st.session_state.resume_data['skills'], str):
-                    st.session_state.resume_data['skills'] = [skill.strip() for skill in st.session_state.resume_data['skills'].split(',')]
-
-                cover_letter_text = generate_cover_letter(llm, st.session_state.resume_data, job_description)
-                st.session_state.cover_letter = cover_letter_text
+                cover_letter_sig = content_signature([st.session_state.resume_json_str, job_description])
+                if st.session_state.cover_letter and cover_letter_sig == st.session_state.cover_letter_sig:
+                    # Keep the user's edits to the letter rather than replacing it with the same draft.
+                    st.info("The cover letter is already up to date with your resume and job description.")
+                else:
+                    llm = get_llm(groq_api_key, 0.5)
+                    cover_letter_text = generate_cover_letter(llm, st.session_state.resume_json_str, job_description)
+                    st.session_state.cover_letter = cover_letter_text
+                    st.session_state.cover_letter_sig = cover_letter_sig
     
+    with assist_col3:
+        if st.button("🎯 Re-tailor to Job Description"):
+            if not groq_api_key:
+                st.error("Please enter your GROQ API key in the sidebar.")
+            elif not job_description.strip():
+                st.error("Please provide a job description in the sidebar to tailor your resume.")
+            else:
+                llm = get_llm(groq_api_key, 0.2)
+                tailored_resume_json = customize_resume_for_job(llm, st.session_state.resume_json_str, job_description)
+                if tailored_resume_json:
+                    set_resume_data(tailored_resume_json)
+                    st.rerun()
+
     if st.session_state.cover_letter:
         st.subheader("Generated Cover Letter")
         st.session_state.cover_letter = st.text_area("Edit your cover letter:", value=st.session_state.cover_letter, height=400)
@@ -272,16 +215,7 @@ if st.session_state.resume_data:
     st.header("📥 Download Your Documents")
     
     if st.button("Prepare Documents for Download"):
-        if not groq_api_key:
-            st.error("Please enter your GROQ API key in the sidebar to format and download.")
-        else:
-            llm = ChatGroq(temperature=0.2, groq_api_key=groq_api_key, model_name="llama-3.3-70b-versatile")
-            
-            if isinstance(resume['skills'], str):
-                resume['skills'] = [skill.strip() for skill in resume['skills'].split(',')]
-
-            markdown_resume = generate_markdown_resume(llm, resume)
-            st.session_state.markdown_resume = markdown_resume
+        st.session_state.markdown_resume = render_markdown(st.session_state.resume_data)
 
     if st.session_state.markdown_resume:
         st.subheader("Formatted Resume Preview")
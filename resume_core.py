@@ -0,0 +1,423 @@
+"""Resume parsing, LLM and formatting helpers used by the Streamlit app."""
+
+import functools
+import hashlib
+import itertools
+import re
+from operator import itemgetter
+import diskcache
+import orjson
+import streamlit as st
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
+
+# --- Constants ---
+MODEL_NAME = "llama-3.3-70b-versatile"
+MAX_CONCURRENCY = 5  # Most Groq calls one rewrite runs at once
+MAX_PDF_PAGES = 20  # LinkedIn exports are short; later pages are cover/legal boilerplate
+MAX_PDF_CHARS = 50_000  # More text than any resume prompt needs
+MAX_PROMPT_CHARS = 16_000  # ~4k tokens of profile text sent to the model
+BOILERPLATE_PATTERNS = [re.compile(r'^Page \d+ of \d+$'), re.compile(r'^Contact$')]
+SECTION_HEADERS = {
+    "Summary", "Experience", "Education", "Skills", "Top Skills", "Projects", "Languages", "Certifications",
+    "Honors-Awards", "Publications", "Patents", "Volunteer Experience", "Recommendations", "Interests",
+}
+LOW_PRIORITY_SECTIONS = {"Languages", "Honors-Awards", "Publications", "Patents", "Recommendations", "Interests"}
+BULLET_MARKER = re.compile(r'^\s*[*•-]\s+')  # One leading list marker, not bold '**' or a minus sign
+
+# --- Resume Schema ---
+
+class ResumeModel(BaseModel):
+    @model_validator(mode='before')
+    @classmethod
+    def drop_nulls(cls, data):
+        """Lets null values from the LLM fall back to the field defaults."""
+        if isinstance(data, dict):
+            return {key: value for key, value in data.items() if value is not None}
+        return data
+
+class Contact(ResumeModel):
+    email: str = ""
+    phone: str = ""
+    linkedin_url: str = ""
+
+class Experience(ResumeModel):
+    title: str = ""
+    company: str = ""
+    duration: str = ""
+    description: str = ""
+
+    @field_validator('description', mode='before')
+    @classmethod
+    def join_bullets(cls, value):
+        """Accepts descriptions returned as a list of bullet points."""
+        if isinstance(value, list):
+            return "\n".join(str(point) for point in value)
+        return value
+
+class Education(ResumeModel):
+    institution: str = ""
+    degree: str = ""
+    duration: str = ""
+
+class Resume(ResumeModel):
+    name: str = ""
+    contact: Contact = Field(default_factory=Contact)
+    summary: str = ""
+    experience: list[Experience] = Field(default_factory=list)
+    education: list[Education] = Field(default_factory=list)
+    skills: list[str] = Field(default_factory=list)
+
+# --- Prompts ---
+# Static instructions come first and are kept byte-identical across calls so the
+# provider can reuse the cached prompt prefix; per-request data goes in the user message.
+
+SYSTEM_RESUME_EXTRACT = """You are an expert resume writer. Your task is to analyze the provided text from a LinkedIn profile or an existing resume and extract the user's information into a structured JSON format.
+The JSON object must have the following keys: 'name', 'contact' (as a dictionary with 'email', 'phone', 'linkedin_url'), 'summary', 'experience' (as a list of objects, each with 'title', 'company', 'duration', and 'description'), 'education' (a list of objects with 'institution', 'degree', 'duration'), and 'skills' (a list of strings).
+Pay close attention to the 'Education' and 'Skills' sections to ensure they are parsed correctly and not mixed.
+- For 'education': An entry should only be included if it is clearly an educational institution, degree, or certification. For entries like fellowships or non-degree programs, parse the main line as 'degree' and the organization as 'institution'. If duration is present, extract it.
+- For 'skills': Extract only the specific skills, which are often listed under a 'Skills' heading or similar. Parse a comma-separated list into a JSON list of individual skill strings.
+Clean and format the text professionally. For job descriptions, convert paragraphs into concise bullet points, each starting with '*'. Infer missing details logically if necessary, but don't invent information that isn't suggested by the text.
+Please provide the output in JSON format only.
+{format_instructions}"""
+
+SYSTEM_RESUME_TAILOR = """You are an expert resume writer and AI-powered resume co-pilot. You will be given the text from a LinkedIn profile or an existing resume, and a job description.
+First, extract the user's information into a structured JSON format. The JSON object must have the following keys: 'name', 'contact' (as a dictionary with 'email', 'phone', 'linkedin_url'), 'summary', 'experience' (as a list of objects, each with 'title', 'company', 'duration', and 'description'), 'education' (a list of objects with 'institution', 'degree', 'duration'), and 'skills' (a list of strings).
+Pay close attention to the 'Education' and 'Skills' sections to ensure they are parsed correctly and not mixed.
+- For 'education': An entry should only be included if it is clearly an educational institution, degree, or certification. For entries like fellowships or non-degree programs, parse the main line as 'degree' and the organization as 'institution'. If duration is present, extract it.
+- For 'skills': Extract only the specific skills, which are often listed under a 'Skills' heading or similar. Parse a comma-separated list into a JSON list of individual skill strings.
+Clean and format the text professionally. Infer missing details logically if necessary, but don't invent information that isn't suggested by the text.
+Then, analyze the job description and strategically write the 'summary' and the 'description' for each 'experience' entry to align the candidate's skills and experience with the requirements of the job.
+- For the summary: Create a powerful, concise professional summary that highlights the candidate's most relevant qualifications for this specific role.
+- For experience descriptions: Write concise bullet points that use keywords and action verbs from the job description. Quantify achievements where possible and emphasize results that match the employer's needs. Ensure all bullet points start with '*'.
+- Do not tailor any other part of the resume. Return the entire JSON object.
+Please provide the tailored resume in JSON format only.
+{format_instructions}"""
+
+SYSTEM_RESUME_CUSTOMIZE = """You are an AI-powered resume co-pilot. You will be given a resume in JSON format and a job description.
+Your task is to analyze the job description and strategically rewrite the 'summary' and the 'description' for each 'experience' entry in the resume.
+The goal is to align the candidate's skills and experience with the requirements of the job.
+- For the summary: Create a powerful, concise professional summary that highlights the candidate's most relevant qualifications for this specific role.
+- For experience descriptions: Rephrase the bullet points to use keywords and action verbs from the job description. Quantify achievements where possible and emphasize results that match the employer's needs. Ensure all bullet points start with '*'.
+- Do not change any other part of the resume JSON. Return the entire modified JSON object.
+Please provide the updated resume in JSON format only.
+{format_instructions}"""
+
+SYSTEM_RESUME_REPAIR = """You are a JSON repair assistant. The resume JSON below does not match the required format.
+Fix it so that it does, keeping all of its content. Do not add information that isn't in it.
+{format_instructions}
+Please provide the fixed resume in JSON format only."""
+
+SYSTEM_SUMMARY_REWRITE = """You are a world-class career coach and resume writer. You will be given a resume in JSON format. Your task is to rewrite its 'summary' to be more impactful, professional, and achievement-oriented.
+- Craft a dynamic and compelling professional summary that immediately grabs the reader's attention and highlights the candidate's unique value proposition.
+- Return only the rewritten summary text, without any heading, comments, or explanations."""
+
+SYSTEM_EXPERIENCE_REWRITE = """You are a world-class career coach and resume writer. You will be given one work experience entry from a resume: the job title, the company, and its current description. Your task is to rewrite the description to be more impactful, professional, and achievement-oriented.
+- Transform the description from a list of duties into a showcase of accomplishments. Use the STAR (Situation, Task, Action, Result) method where possible. Start each bullet point with a strong action verb. Quantify results with numbers, percentages, or other metrics whenever you can infer them or suggest placeholders (e.g., 'Increased efficiency by over 25%').
+- Put each bullet point on its own line, starting with '*'.
+- Return only the rewritten bullet points, without any heading, comments, or explanations."""
+
+SYSTEM_COVER_LETTER = """You are a professional career writer. Your task is to write a compelling and professional cover letter based on a candidate's resume and a specific job description.
+The cover letter should be well-structured, concise, and tailored to the job.
+- **Introduction:** Start with a strong opening that states the position being applied for and where it was seen.
+- **Body Paragraphs:** Create 2-3 paragraphs that connect the candidate's key experiences and skills from their resume to the specific requirements listed in the job description. Do not just repeat the resume; explain *how* their experience is relevant.
+- **Conclusion:** End with a strong closing paragraph that reiterates interest in the role and includes a clear call to action (e.g., expressing eagerness to discuss their qualifications in an interview).
+- **Formatting:** Use professional and friendly language. The output should be a single block of text formatted in Markdown."""
+
+# --- Core Functions ---
+
+def _dumps(value):
+    """Serializes to compact JSON with sorted keys so equal content always gives the same string."""
+    return orjson.dumps(value, option=orjson.OPT_SORT_KEYS).decode()
+
+def serialize_resume(resume_data):
+    """Returns the canonical JSON string that the LLM helpers take in place of the resume dict."""
+    return _dumps(resume_data)
+
+def content_signature(value):
+    """Returns a short blake2b digest of the value's canonical JSON, for telling whether content has changed."""
+    return hashlib.blake2b(_dumps(value).encode(), digest_size=16).hexdigest()
+
+@st.cache_resource(show_spinner=False)
+def get_llm_cache():
+    """Returns the on-disk cache of LLM responses shared across sessions and restarts."""
+    return diskcache.Cache(".llm_cache")
+
+def stream_json(chain, inputs):
+    """Streams the chain's raw JSON text, showing the partially parsed object in a placeholder."""
+    from langchain_core.output_parsers import JsonOutputParser
+    from langchain_core.outputs import Generation
+    parser = JsonOutputParser()
+    placeholder = st.empty()
+    text = ""
+    for chunk in chain.stream(inputs):
+        text += chunk.content
+        partial = parser.parse_result([Generation(text=text)], partial=True)
+        if partial:
+            placeholder.json(partial)
+    placeholder.empty()
+    return text
+
+def stream_text(chain, inputs):
+    """Streams the chain's text into a placeholder as it is generated and returns the full string."""
+    placeholder = st.empty()
+    text = placeholder.write_stream(chain.stream(inputs))
+    placeholder.empty()
+    return text
+
+@functools.lru_cache(maxsize=None)
+def _build_prompt(system, user):
+    """Builds each (system, user) chat prompt once, with the Resume format instructions filled in where used."""
+    from langchain_core.output_parsers import PydanticOutputParser
+    from langchain_core.prompts import ChatPromptTemplate
+    prompt = ChatPromptTemplate.from_messages([("system", system), ("user", user)])
+    if "format_instructions" in prompt.input_variables:
+        prompt = prompt.partial(format_instructions=PydanticOutputParser(pydantic_object=Resume).get_format_instructions())
+    return prompt
+
+def _prompt_key(prompt):
+    """Returns the prompt's template and partial values, so a Resume schema change also changes the cache key."""
+    return [prompt.pretty_repr(), prompt.partial_variables]
+
+def cached_invoke(chain, inputs, cache_key_fields, run=None):
+    """Invokes the chain (or `run(chain, inputs)`), reusing a stored response when the cache key fields match."""
+    key = hashlib.sha256(_dumps(cache_key_fields).encode()).hexdigest()
+    llm_cache = get_llm_cache()
+    response = llm_cache.get(key)
+    if response is None:
+        response = run(chain, inputs) if run else chain.invoke(inputs)
+        if response is not None:
+            llm_cache.set(key, response)
+    return response
+
+def parse_resume(_llm, text):
+    """Parses resume JSON from the LLM, asking it once to fix output that is malformed or missing keys."""
+    from langchain_core.exceptions import OutputParserException
+    from langchain_core.output_parsers import JsonOutputParser, PydanticOutputParser
+    parser = PydanticOutputParser(pydantic_object=Resume)
+    try:
+        data = JsonOutputParser().parse(text)
+        resume = Resume.model_validate(data)
+        missing = [key for key in Resume.model_fields if key not in data]
+        if not missing:
+            return resume.model_dump()
+        error = f"The JSON object is missing the required keys: {', '.join(missing)}"
+    except (OutputParserException, ValidationError) as e:
+        error = str(e)
+
+    prompt = _build_prompt(SYSTEM_RESUME_REPAIR, "Here is the malformed output:\n\n{completion}\n\nHere is the error:\n\n{error}")
+
+    chain = prompt | _llm.bind(response_format={"type": "json_object"}) | parser
+    with st.spinner("Fixing the resume format..."):
+        try:
+            return chain.invoke({"completion": text, "error": error}).model_dump()
+        except OutputParserException:
+            st.error("The AI returned a resume that could not be read. Please try again.")
+            return None
+
+# Keyed on each visitor's API key, so bound it rather than keeping every client until restart.
+@st.cache_resource(show_spinner=False, max_entries=32, ttl=3600)
+def get_llm(api_key, temperature, model_name=MODEL_NAME):
+    """Returns a shared Groq chat model so its HTTP connection pool is reused across reruns."""
+    from langchain_groq import ChatGroq
+    return ChatGroq(temperature=temperature, groq_api_key=api_key, model_name=model_name)
+
+def extract_text_from_pdf(pdf_file):
+    """Extracts text content from an uploaded PDF file."""
+    return _extract_from_bytes(pdf_file.getvalue())
+
+# Shared across sessions, so keep only recent uploads rather than every file's text.
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def _extract_from_bytes(pdf_bytes):
+    """Extracts text from PDF bytes; cached on the bytes so re-uploads of the same file skip parsing."""
+    import pypdfium2 as pdfium
+    try:
+        # pdfium reads straight from the upload's buffer, so large files aren't copied again.
+        with pdfium.PdfDocument(pdf_bytes) as pdf:
+            parts = []
+            total = 0
+            for i in range(len(pdf)):
+                if i >= MAX_PDF_PAGES or total > MAX_PDF_CHARS:
+                    st.info(f"Only the first {i} pages of the PDF were used for your resume.")
+                    break
+                page = pdf[i]
+                textpage = page.get_textpage()
+                page_text = textpage.get_text_range().replace("\r\n", "\n")
+                textpage.close()
+                page.close()
+                parts.append(page_text)
+                total += len(page_text)
+        text = "\n".join(parts)
+        if not text.strip():
+            # Scanned, image-only pages have no text layer; don't send an empty document to the model.
+            st.error("No text could be read from this PDF. Please upload a PDF with selectable text.")
+            return None
+        return text
+    except Exception as e:
+        st.error(f"Error reading PDF file: {e}")
+        return None
+
+def _clean(text):
+    """Drops page furniture and repeated lines from PDF text, shortening low-priority sections if it is too long."""
+    lines = [line.strip() for line in text.splitlines()]
+    lines = [line for line in lines if not any(p.match(line) for p in BOILERPLATE_PATTERNS)]
+    lines = [line for line, _ in itertools.groupby(lines)]
+    cleaned = "\n".join(lines).strip()
+    if len(cleaned) <= MAX_PROMPT_CHARS:
+        return cleaned
+
+    # Take lines from each section in turn, so every section keeps at least its opening lines
+    # (headers, most recent roles) and low-priority sections only get what budget is left.
+    sections = {}
+    section = None
+    for i, line in enumerate(lines):
+        if line in SECTION_HEADERS:
+            section = line
+        sections.setdefault(section, []).append(i)
+    keep = {}
+    oversized = []
+    budget = MAX_PROMPT_CHARS
+    for low_priority in (False, True):
+        queues = [indexes for name, indexes in sections.items() if (name in LOW_PRIORITY_SECTIONS) == low_priority]
+        for i in itertools.chain.from_iterable(itertools.zip_longest(*queues)):
+            if i is None:
+                continue
+            if len(lines[i]) >= budget:
+                oversized.append(i)
+                continue
+            keep[i] = lines[i]
+            budget -= len(lines[i]) + 1
+    # Lines too long to fit whole are cut down to whatever budget the shorter lines left.
+    for i in oversized:
+        if budget <= 1:
+            break
+        keep[i] = lines[i][:budget - 1]
+        budget -= len(keep[i]) + 1
+    st.info("Your profile is long, so some of its less relevant lines were left out of the resume.")
+    return "\n".join(keep[i] for i in sorted(keep)).strip()
+
+def generate_resume_from_text(_llm, text):
+    """Uses LLM to parse text and generate a structured resume in JSON."""
+    prompt = _build_prompt(SYSTEM_RESUME_EXTRACT, "Here is the text from the document:\n\n{document_text}")
+    
+    chain = prompt | _llm.bind(response_format={"type": "json_object"})
+    inputs = {"document_text": _clean(text)}
+    with st.spinner("Generating resume from your profile..."):
+        response = cached_invoke(chain, inputs, [_prompt_key(prompt), inputs, _llm.model_name, _llm.temperature],
+                                 lambda chain, inputs: parse_resume(_llm, stream_json(chain, inputs)))
+    return response
+
+def customize_resume_for_job(_llm, resume_json_str, job_description):
+    """Uses LLM to tailor the resume for a specific job description."""
+    prompt = _build_prompt(SYSTEM_RESUME_CUSTOMIZE, "Here is the current resume:\n\n{resume}\n\nHere is the job description:\n\n{job_post}")
+    
+    chain = prompt | _llm.bind(response_format={"type": "json_object"})
+    inputs = {"resume": resume_json_str, "job_post": job_description}
+    with st.spinner("Customizing resume for the job post..."):
+        response = cached_invoke(chain, inputs, [_prompt_key(prompt), inputs, _llm.model_name, _llm.temperature],
+                                 lambda chain, inputs: parse_resume(_llm, stream_json(chain, inputs)))
+    return response
+
+def generate_tailored_resume(_llm, text, job_description):
+    """Uses LLM to generate a structured resume in JSON already tailored to a job description."""
+    prompt = _build_prompt(SYSTEM_RESUME_TAILOR, "Here is the text from the document:\n\n{document_text}\n\nHere is the job description:\n\n{job_post}")
+
+    chain = prompt | _llm.bind(response_format={"type": "json_object"})
+    inputs = {"document_text": _clean(text), "job_post": job_description}
+    with st.spinner("Generating a resume tailored to the job post..."):
+        response = cached_invoke(chain, inputs, [_prompt_key(prompt), inputs, _llm.model_name, _llm.temperature],
+                                 lambda chain, inputs: parse_resume(_llm, stream_json(chain, inputs)))
+    return response
+
+def render_markdown(resume):
+    """Converts resume JSON into a clean Markdown document."""
+    contact = resume.get('contact') or {}
+    contact_line = " | ".join(
+        value for value in (contact.get('email'), contact.get('phone'), contact.get('linkedin_url')) if value
+    )
+    lines = [f"# {resume.get('name', '')}"]
+    if contact_line:
+        lines.append(contact_line)
+    lines += ["", "## Professional Summary", resume.get('summary', ''), ""]
+
+    # Two trailing spaces are a Markdown hard break, so durations and degrees stay on their own line.
+    lines.append("## Work Experience")
+    for exp in resume.get('experience', []):
+        heading = f"**{exp.get('title', '')} at {exp.get('company', '')}**"
+        duration = exp.get('duration', '')
+        lines += [f"{heading}  \n{duration}" if duration else heading, ""]
+        description = exp.get('description', '')
+        if isinstance(description, list):
+            description = "\n".join(description)
+        for point in description.split('\n'):
+            point = BULLET_MARKER.sub('', point).strip()
+            if point:
+                lines.append(f"* {point}")
+        lines.append("")
+
+    lines.append("## Education")
+    for edu in resume.get('education', []):
+        heading = f"**{edu.get('institution', '')}**"
+        degree_line = " | ".join(value for value in (edu.get('degree'), edu.get('duration')) if value)
+        lines += [f"{heading}  \n{degree_line}" if degree_line else heading, ""]
+
+    skills = resume.get('skills', [])
+    if isinstance(skills, list):
+        skills = ", ".join(skills)
+    if skills:
+        lines += ["## Skills", skills]
+    return "\n".join(lines).strip()
+
+def _rewrite_inputs(resume_data):
+    """Returns the prompt inputs of the impact rewrite; the name and contact details are left out."""
+    context = {key: resume_data.get(key) for key in ('summary', 'experience', 'education', 'skills')}
+    return {
+        "resume": _dumps(context),
+        "experience": [
+            {"title": exp.get('title', ''), "company": exp.get('company', ''), "current_description": exp.get('description', '')}
+            for exp in resume_data.get('experience', [])
+        ],
+    }
+
+def rewrite_signature(resume_data):
+    """Returns the content signature of everything rewrite_resume_for_impact would send to the model."""
+    return content_signature(_rewrite_inputs(resume_data))
+
+def rewrite_resume_for_impact(_llm, resume_json_str):
+    """Uses LLM to rewrite the summary and each experience description, in parallel, to be more effective."""
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.runnables import RunnableParallel
+    parser = StrOutputParser()
+    summary_prompt = _build_prompt(SYSTEM_SUMMARY_REWRITE, "Here is the resume:\n\n{resume}")
+    bullet_prompt = _build_prompt(SYSTEM_EXPERIENCE_REWRITE, "Job title: {title}\nCompany: {company}\n\nHere is the current description:\n\n{current_description}")
+
+    chain = RunnableParallel(
+        summary=summary_prompt | _llm | parser,
+        # The summary call takes one slot, so the bullet calls share the rest of the limit.
+        descriptions=itemgetter("experience") | (bullet_prompt | _llm | parser).map().with_config(max_concurrency=MAX_CONCURRENCY - 1),
+    )
+    resume_data = orjson.loads(resume_json_str)
+    experience = resume_data.get('experience', [])
+    inputs = _rewrite_inputs(resume_data)
+    with st.spinner("Rewriting your resume for maximum impact..."):
+        rewritten = cached_invoke(
+            chain, inputs,
+            [_prompt_key(summary_prompt), _prompt_key(bullet_prompt), inputs, _llm.model_name, _llm.temperature],
+        )
+
+    response = dict(resume_data, summary=rewritten["summary"].strip())
+    response['experience'] = [
+        dict(exp, description=description.strip()) for exp, description in zip(experience, rewritten["descriptions"])
+    ]
+    return response
+
+def generate_cover_letter(_llm, resume_json_str, job_description):
+    """Uses LLM to generate a cover letter."""
+    from langchain_core.output_parsers import StrOutputParser
+    parser = StrOutputParser()
+    prompt = _build_prompt(SYSTEM_COVER_LETTER, "Here is the candidate's resume:\n\n{resume}\n\nHere is the job description they are applying for:\n\n{job_post}")
+
+    chain = prompt | _llm | parser
+    inputs = {"resume": resume_json_str, "job_post": job_description}
+    with st.spinner("Generating a draft cover letter..."):
+        response = cached_invoke(chain, inputs, [_prompt_key(prompt), inputs, _llm.model_name, _llm.temperature], stream_text)
+    return response
@@ -0,0 +1,85 @@
+import io
+
+import pypdfium2 as pdfium
+
+from resume_core import (
+    MAX_PROMPT_CHARS,
+    SYSTEM_RESUME_EXTRACT,
+    _build_prompt,
+    _clean,
+    _dumps,
+    _extract_from_bytes,
+    _prompt_key,
+    render_markdown,
+    rewrite_signature,
+)
+
+
+def test_extract_returns_none_for_pdf_without_text():
+    pdf = pdfium.PdfDocument.new()
+    for _ in range(3):
+        pdf.new_page(612, 792)
+    buffer = io.BytesIO()
+    pdf.save(buffer)
+    assert _extract_from_bytes(buffer.getvalue()) is None
+
+
+def test_clean_drops_page_furniture_and_repeats():
+    text = "Contact\na@b.c\nPage 1 of 2\n\n\n\nAnn Lee\nAnn Lee\nPage 2 of 2\nSummary"
+    assert _clean(text) == "a@b.c\n\nAnn Lee\nSummary"
+
+
+def test_clean_keeps_short_lines_after_an_oversized_one():
+    cleaned = _clean("Summary\n" + "z" * 20000 + "\nExperience\nfoo\nEducation\nbar")
+    lines = cleaned.split("\n")
+    assert lines[0] == "Summary" and set(lines[1]) == {"z"}
+    assert lines[2:] == ["Experience", "foo", "Education", "bar"]
+    assert len(cleaned) <= MAX_PROMPT_CHARS
+
+
+def test_clean_every_section_keeps_its_opening_lines():
+    experience = "\n".join(f"did thing {i}" for i in range(1500))
+    publications = "\n".join(f"paper {i}" for i in range(500))
+    cleaned = _clean(f"Experience\n{experience}\nPublications\n{publications}\nEducation\nMIT")
+    assert len(cleaned) <= MAX_PROMPT_CHARS
+    assert "Education\nMIT" in cleaned
+    assert "did thing 0\n" in cleaned
+    assert "paper 0" not in cleaned
+
+
+def test_render_markdown_strips_only_the_bullet_marker():
+    resume = {
+        "name": "Ann Lee",
+        "contact": {},
+        "summary": "Engineer.",
+        "experience": [{"title": "Dev", "company": "X", "duration": "2020-22",
+                        "description": "* **Led** migration\n* -5% churn\n• Shipped B"}],
+        "education": [{"institution": "MIT", "degree": "BS", "duration": "2016"}],
+        "skills": [],
+    }
+    assert render_markdown(resume) == (
+        "# Ann Lee\n\n## Professional Summary\nEngineer.\n\n"
+        "## Work Experience\n**Dev at X**  \n2020-22\n\n* **Led** migration\n* -5% churn\n* Shipped B\n\n"
+        "## Education\n**MIT**  \nBS | 2016"
+    )
+
+
+def test_rewrite_signature_tracks_rewrite_inputs_only():
+    resume = {
+        "name": "Ann Lee",
+        "contact": {"email": "a@b.c"},
+        "summary": "Engineer.",
+        "experience": [{"title": "Engineer", "company": "X", "duration": "2020-22", "description": "* Built A"}],
+        "education": [],
+        "skills": ["Python"],
+    }
+    signature = rewrite_signature(resume)
+    assert rewrite_signature(dict(resume, contact={"email": "ann@b.c"})) == signature
+    retitled = [dict(resume["experience"][0], title="Staff Engineer")]
+    assert rewrite_signature(dict(resume, experience=retitled)) != signature
+
+
+def test_prompt_key_includes_the_resume_format_instructions():
+    prompt = _build_prompt(SYSTEM_RESUME_EXTRACT, "Here is the text from the document:\n\n{document_text}")
+    changed_schema = prompt.partial(format_instructions="A different schema.")
+    assert _dumps(_prompt_key(changed_schema)) != _dumps(_prompt_key(prompt))